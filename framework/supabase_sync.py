@@ -92,6 +92,19 @@ def _upsert(table: str, data: dict, on_conflict: str) -> dict | None:
     return rows[0] if rows else None
 
 
+def _upsert_many(table: str, rows: list[dict], on_conflict: str) -> None:
+    """Bulk upsert rows in a single PostgREST request.
+
+    Every row must have the same keys, including any NOT NULL columns.
+    """
+    url = f"{_rest_url(table)}?on_conflict={on_conflict}"
+    headers = _headers("return=minimal,resolution=merge-duplicates")
+    resp = httpx.post(url, json=rows, headers=headers, timeout=60)
+    if resp.status_code >= 400:
+        print(f"  PostgREST error ({resp.status_code}): {resp.text[:500]}")
+    resp.raise_for_status()
+
+
 def _get(table: str, params: str = "") -> list[dict]:
     """GET rows from PostgREST."""
     url = f"{_rest_url(table)}{('?' + params) if params else ''}"
@@ -11,6 +11,7 @@ Usage:
 
 import argparse
 import json
+import os
 import re
 import sys
 import time
@@ -23,6 +24,21 @@ PINE_DIR = PROJECT_ROOT / "pinescript"
 COOKIES_FILE = PROJECT_ROOT / "results" / ".tv_cookies.json"
 STATE_FILE = PROJECT_ROOT / "results" / ".scrape_state.json"
 
+# Present once a script page has rendered its source code (or the tab for it)
+SOURCE_READY_SELECTOR = (
+    'pre, code, [class*="sourceCode"], '
+    'button:has-text("Source code"), [role="tab"]:has-text("Source code")'
+)
+
+# Flush state to disk after this many processed scripts
+SAVE_EVERY = 25
+
+# Back off only when the server pushes back: start at BACKOFF_START seconds on a
+# 429/503, double on each further one, and halve after every wait that follows
+BACKOFF_STATUSES = {429, 503}
+BACKOFF_START = 2.0
+BACKOFF_MAX = 60.0
+
 CATEGORY_URLS = {
     "editors_picks": "https://www.tradingview.com/scripts/editors-picks/",
     "top": "https://www.tradingview.com/scripts/?sort=top",
@@ -36,11 +52,16 @@ CATEGORY_URLS = {
 }
 
 
+_SLUG_RE1 = re.compile(r"[^\w\s-]")
+_SLUG_RE2 = re.compile(r"[\s_]+")
+_SLUG_RE3 = re.compile(r"-+")
+
+
 def slugify(name: str) -> str:
     slug = name.lower().strip()
-    slug = re.sub(r"[^\w\s-]", "", slug)
-    slug = re.sub(r"[\s_]+", "-", slug)
-    slug = re.sub(r"-+", "-", slug).strip("-")
+    slug = _SLUG_RE1.sub("", slug)
+    slug = _SLUG_RE2.sub("-", slug)
+    slug = _SLUG_RE3.sub("-", slug).strip("-")
     return slug[:80]
 
 
@@ -52,7 +73,10 @@ def load_state() -> dict:
 
 def save_state(state: dict):
     STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    STATE_FILE.write_text(json.dumps(state, indent=2))
+    # Write-then-rename so an interrupted save never leaves truncated JSON
+    tmp = STATE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    os.replace(tmp, STATE_FILE)
 
 
 def collect_script_urls(page, category: str, limit: int = 0) -> list[dict]:
@@ -118,7 +142,12 @@ def collect_script_urls(page, category: str, limit: int = 0) -> list[dict]:
 def extract_pine_source(page, script_url: str) -> str | None:
     """Navigate to a script page and extract Pine Script source code."""
     try:
-        page.goto(script_url, wait_until="networkidle", timeout=20000)
+        page.goto(script_url, wait_until="domcontentloaded", timeout=20000)
+        try:
+            # Gate on the source container (or its tab) rather than network idle
+            page.wait_for_selector(SOURCE_READY_SELECTOR, timeout=5000)
+        except Exception:
+            pass
         time.sleep(1)
 
         # Check if it's open source
@@ -141,31 +170,41 @@ def extract_pine_source(page, script_url: str) -> str | None:
 
         # Extract code from the code container
         code = page.evaluate("""() => {
-            // Find the smallest element containing //@version
-            let bestMatch = null;
-            let bestSize = Infinity;
+            // Smallest Pine-looking node wins; skip containers that wrap page nav.
+            // textContent is only a cheap screen - the winner is read with
+            // innerText, which keeps <br>/block line breaks and skips hidden text
+            let bestNode = null;
+            let bestLength = Infinity;
+            const consider = (node) => {
+                const text = node.textContent;
+                if (!text || !text.includes('//@version')) return;
+                if (text.length > 500000) return;
+                if (!(text.includes('indicator(') || text.includes('strategy(') || text.includes('library('))) return;
+                if (text.includes('Products') && text.includes('Brokers')) return;
+                if (text.length < bestLength) {
+                    bestNode = node;
+                    bestLength = text.length;
+                }
+            };
 
+            // Code containers first - a handful of nodes instead of the whole tree
+            const candidates = document.querySelectorAll(
+                'pre, code, [class*="sourceCode"], [class*="codeBlock"]'
+            );
+            candidates.forEach(consider);
+            if (bestNode !== null) return bestNode.innerText;
+
+            // Unknown container - fall back to walking every element
             const walker = document.createTreeWalker(
                 document.body, NodeFilter.SHOW_ELEMENT, null
             );
 
             let node;
             while (node = walker.nextNode()) {
-                const text = node.innerText;
-                if (!text || !text.includes('//@version')) continue;
-                if (text.length > 500000) continue;
-
-                if (text.includes('indicator(') || text.includes('strategy(') || text.includes('library(')) {
-                    // Make sure it doesn't include nav elements
-                    const hasNav = text.includes('Products') && text.includes('Brokers');
-                    if (!hasNav && text.length < bestSize) {
-                        bestSize = text.length;
-                        bestMatch = text;
-                    }
-                }
+                consider(node);
             }
 
-            return bestMatch;
+            return bestNode !== null ? bestNode.innerText : null;
         }""")
 
         if code:
@@ -180,6 +219,26 @@ def extract_pine_source(page, script_url: str) -> str | None:
         return None
 
 
+class Backoff:
+    """Delay driven by server throttling signals instead of fixed sleeps."""
+
+    def __init__(self):
+        self.backoff = 0.0
+
+    def on_response(self, response):
+        """page.on("response") handler: raise the delay on 429/503."""
+        if response.status in BACKOFF_STATUSES:
+            self.backoff = min(max(self.backoff * 2, BACKOFF_START), BACKOFF_MAX)
+
+    def wait(self):
+        """Sleep for the current delay, if any, then let it decay."""
+        delay = self.backoff
+        self.backoff = delay / 2 if delay / 2 >= 0.5 else 0.0
+        if delay:
+            print(f"    Server throttling - backing off {delay:.1f}s")
+            time.sleep(delay)
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--category", choices=list(CATEGORY_URLS.keys()))
@@ -213,6 +272,8 @@ def main():
         # Set cookies
         context.add_cookies(cookies)
         page = context.new_page()
+        backoff = Backoff()
+        page.on("response", backoff.on_response)
 
         # Determine what to scrape
         if args.urls:
@@ -240,47 +301,59 @@ def main():
         total_skipped = 0
         total_closed = 0
 
-        for category, scripts in script_lists.items():
-            print(f"\n{'='*60}")
-            print(f"Category: {category} ({len(scripts)} scripts)")
-            print(f"{'='*60}")
-
-            cat_dir = PINE_DIR / category
-            cat_dir.mkdir(parents=True, exist_ok=True)
-
-            for i, script in enumerate(scripts, 1):
-                name = script["name"]
-                url = script["url"]
-                slug = slugify(name)
-
-                pine_path = cat_dir / f"{slug}.pine"
-
-                # Skip if already scraped (state or file on disk)
-                if args.incremental:
-                    if url in state["scraped"] or pine_path.exists():
-                        if pine_path.exists() and url not in state["scraped"]:
-                            state["scraped"].append(url)
-                            save_state(state)
-                        total_skipped += 1
-                        continue
-
-                print(f"\n  [{i}/{len(scripts)}] {name[:60]}")
-
-                code = extract_pine_source(page, url)
-
-                if code:
-                    pine_path.write_text(code, encoding="utf-8")
-                    lines = code.count("\n") + 1
-                    print(f"    Saved: {slug}.pine ({lines} lines)")
-                    state["scraped"].append(url)
-                    total_saved += 1
-                else:
-                    print(f"    Skipped (closed source or extraction failed)")
-                    state["scraped"].append(url)
-                    total_closed += 1
-
+        # State is flushed every SAVE_EVERY scripts and once more on exit
+        unsaved = 0
+        try:
+            for category, scripts in script_lists.items():
+                print(f"\n{'='*60}")
+                print(f"Category: {category} ({len(scripts)} scripts)")
+                print(f"{'='*60}")
+
+                cat_dir = PINE_DIR / category
+                cat_dir.mkdir(parents=True, exist_ok=True)
+                # One directory read instead of a stat() per script
+                existing = {e.name[:-5] for e in os.scandir(cat_dir) if e.name.endswith(".pine")}
+
+                for i, script in enumerate(scripts, 1):
+                    name = script["name"]
+                    url = script["url"]
+                    slug = slugify(name)
+
+                    pine_path = cat_dir / f"{slug}.pine"
+
+                    # Skip if already scraped (state or file on disk)
+                    if args.incremental:
+                        if url in state["scraped"] or slug in existing:
+                            if slug in existing and url not in state["scraped"]:
+                                state["scraped"].append(url)
+                                unsaved += 1
+                            total_skipped += 1
+                            continue
+
+                    print(f"\n  [{i}/{len(scripts)}] {name[:60]}")
+
+                    code = extract_pine_source(page, url)
+
+                    if code:
+                        pine_path.write_text(code, encoding="utf-8")
+                        lines = code.count("\n") + 1
+                        print(f"    Saved: {slug}.pine ({lines} lines)")
+                        existing.add(slug)
+                        state["scraped"].append(url)
+                        total_saved += 1
+                    else:
+                        print(f"    Skipped (closed source or extraction failed)")
+                        state["scraped"].append(url)
+                        total_closed += 1
+
+                    unsaved += 1
+                    if unsaved >= SAVE_EVERY:
+                        save_state(state)
+                        unsaved = 0
+                    backoff.wait()  # Rate limit only when throttled
+        finally:
+            if unsaved:
                 save_state(state)
-                time.sleep(0.5)  # Rate limit
 
         browser.close()
 
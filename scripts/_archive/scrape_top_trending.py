@@ -9,7 +9,6 @@ These pages have a different structure than category-specific pages.
 
 import json
 import re
-import time
 from pathlib import Path
 from playwright.sync_api import sync_playwright
 
@@ -18,6 +17,19 @@ PINE_DIR = PROJECT_ROOT / "pinescript"
 COOKIES_FILE = PROJECT_ROOT / "results" / ".tv_cookies.json"
 STATE_FILE = PROJECT_ROOT / "results" / ".scrape_state_optimized.json"
 HASHES_FILE = PROJECT_ROOT / "results" / ".script_hashes.json"
+URL_INDEX_FILE = PROJECT_ROOT / "results" / ".url_index.json"
+
+# Containers TradingView renders the Pine source into
+SOURCE_LOCATOR = 'div.tv-chart-view__pine-source, pre:has-text("//@version"), div.monaco-editor'
+
+# Chromium flags and resource types not needed to read the Pine source
+BROWSER_ARGS = [
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-extensions",
+    "--disable-blink-features=AutomationControlled",
+]
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
 
 CATEGORY_URLS = {
     "top": "https://www.tradingview.com/scripts/?sort=top",
@@ -52,10 +64,28 @@ def compute_content_hash(pine_code: str) -> str:
     return hashlib.sha256(pine_code.encode('utf-8')).hexdigest()
 
 
-def is_duplicate(pine_code: str, hashes: dict) -> bool:
+def is_duplicate(pine_code: str, hash_set: set) -> bool:
     """Check if script content is a duplicate."""
     content_hash = compute_content_hash(pine_code)
-    return content_hash in hashes.values()
+    return content_hash in hash_set
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a script URL so listing variants share one cache key."""
+    return url.split("#", 1)[0].split("?", 1)[0].rstrip("/")
+
+
+def load_url_index() -> dict:
+    """Load the URL -> content hash index from previous runs."""
+    if URL_INDEX_FILE.exists():
+        return json.loads(URL_INDEX_FILE.read_text())
+    return {}
+
+
+def save_url_index(url_index: dict):
+    """Save the URL -> content hash index."""
+    URL_INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+    URL_INDEX_FILE.write_text(json.dumps(url_index, indent=2))
 
 
 def load_state() -> dict:
@@ -78,7 +108,6 @@ def extract_pine_source(page, script_url: str, max_retries: int = 2) -> str | No
     for attempt in range(max_retries):
         try:
             page.goto(script_url, wait_until="networkidle", timeout=20000)
-            time.sleep(0.5)
 
             # Check if it's open source
             is_open = page.evaluate("""() => {
@@ -94,38 +123,19 @@ def extract_pine_source(page, script_url: str, max_retries: int = 2) -> str | No
                 source_tab = page.locator('button:has-text("Source code"), [role="tab"]:has-text("Source code")')
                 if source_tab.is_visible(timeout=2000):
                     source_tab.click()
-                    time.sleep(1)
+                    page.wait_for_selector(SOURCE_LOCATOR, timeout=3000)
             except Exception:
                 pass
 
-            # Extract code
-            code = page.evaluate("""() => {
-                // Find the smallest element containing //@version
-                let bestMatch = null;
-                let bestSize = Infinity;
-
-                const walker = document.createTreeWalker(
-                    document.body, NodeFilter.SHOW_ELEMENT, null
-                );
-
-                let node;
-                while (node = walker.nextNode()) {
-                    const text = node.innerText;
-                    if (!text || !text.includes('//@version')) continue;
-                    if (text.length > 500000) continue;
-
-                    if (text.includes('indicator(') || text.includes('strategy(') || text.includes('library(')) {
-                        // Make sure it doesn't include nav elements
-                        const hasNav = text.includes('Products') && text.includes('Brokers');
-                        if (!hasNav && text.length < bestSize) {
-                            bestSize = text.length;
-                            bestMatch = text;
-                        }
-                    }
-                }
+            # Extract code from the source container; fall back to a plain
+            # <pre> lookup only when the locator misses
+            try:
+                code = page.locator(SOURCE_LOCATOR).first.inner_text(timeout=3000)
+            except Exception:
+                code = page.evaluate("() => document.querySelector('pre')?.innerText ?? null")
 
-                return bestMatch;
-            }""")
+            if code and "//@version" not in code:
+                code = None
 
             if code:
                 # Clean up non-breaking spaces
@@ -137,7 +147,7 @@ def extract_pine_source(page, script_url: str, max_retries: int = 2) -> str | No
         except Exception as e:
             print(f"    Retry {attempt + 1}/{max_retries}: {e}")
             if attempt < max_retries - 1:
-                time.sleep(2)
+                page.wait_for_timeout(2000)
             continue
 
     return None
@@ -155,27 +165,39 @@ def scrape_category(
     print(f"Category: {category}")
     print(f"{'='*60}")
 
+    # Loaded up front so the finally block can always persist them
+    state = load_state()
+    scraped_set = set(state["scraped"])
+    url_index = load_url_index()
+
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
+        browser = p.chromium.launch(headless=True, args=BROWSER_ARGS)
         context = browser.new_context(
             viewport={"width": 1920, "height": 1080},
             user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
         )
         context.add_cookies(cookies)
+        context.route("**/*", lambda route: (
+            route.abort() if route.request.resource_type in BLOCKED_RESOURCE_TYPES
+            else route.continue_()
+        ))
         page = context.new_page()
 
         try:
             url = CATEGORY_URLS[category]
             print(f"\nCollecting scripts from {category}: {url}")
             page.goto(url, wait_until="networkidle", timeout=30000)
-            time.sleep(2)
+            try:
+                page.wait_for_selector('a[href*="/script/"]', timeout=5000)
+            except Exception:
+                pass
 
             # Dismiss any popups
             try:
-                dont_need = page.locator('button:has-text("Don\\'t need")')
+                dont_need = page.locator("button:has-text('Don\\'t need')")
                 if dont_need.is_visible(timeout=3000):
                     dont_need.click()
-                    time.sleep(1)
+                    dont_need.wait_for(state="hidden", timeout=3000)
             except Exception:
                 pass
 
@@ -188,12 +210,28 @@ def scrape_category(
             print(f"    Aggressive mode: {aggressive} (max_scrolls={max_scrolls}, threshold={no_new_threshold})")
 
             for i in range(max_scrolls):
-                current_height = page.evaluate("document.body.scrollHeight")
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                time.sleep(0.5 if aggressive else 1)
-                new_height = page.evaluate("document.body.scrollHeight")
+                # Scroll and measure in one roundtrip
+                heights = page.evaluate("""() => {
+                    const before = document.body.scrollHeight;
+                    window.scrollTo(0, before);
+                    return new Promise(r => requestAnimationFrame(
+                        () => r({before, after: document.body.scrollHeight})
+                    ));
+                }""")
+
+                if heights["after"] == heights["before"]:
+                    # Wait for lazy-loaded cards to grow the page instead of a fixed sleep
+                    try:
+                        page.wait_for_function(
+                            "h => document.body.scrollHeight > h",
+                            arg=heights["before"],
+                            timeout=500 if aggressive else 1000,
+                        )
+                        no_new_count = 0
+                        continue
+                    except Exception:
+                        pass
 
-                if new_height == current_height:
                     no_new_count += 1
                     if no_new_count >= no_new_threshold:
                         print(f"    Scroll stopped after {i+1} scrolls (no new content)")
@@ -205,6 +243,7 @@ def scrape_category(
             scripts = page.evaluate("""() => {
                 const links = document.querySelectorAll('a[href*="/script/"]');
                 const seen = new Set();
+                const seenNames = new Set();
                 const results = [];
                 for (const link of links) {
                     const href = link.getAttribute('href');
@@ -216,9 +255,10 @@ def scrape_category(
 
                         // Skip duplicate names
                         const lowerName = name.toLowerCase();
-                        if (Array.from(results).some(r => r.name.toLowerCase() === lowerName)) continue;
+                        if (seenNames.has(lowerName)) continue;
 
                         seen.add(href);
+                        seenNames.add(lowerName);
                         results.push({
                             name: name.substring(0, 100),
                             url: href.startsWith('/') ? 'https://www.tradingview.com' + href : href
@@ -233,9 +273,9 @@ def scrape_category(
 
             print(f"  Found {len(scripts)} scripts")
 
-            # Load state and hashes
-            state = load_state()
+            # Load hashes
             hashes = load_hashes()
+            hash_set = set(hashes.values())
             category_dir = PINE_DIR / category
             category_dir.mkdir(parents=True, exist_ok=True)
 
@@ -256,13 +296,21 @@ def scrape_category(
 
                 print(f"\n  [{i}/{len(scripts)}] {name[:60]}")
 
-                # Skip if already scraped
-                if skip_already_scraped and (url in state["scraped"] or pine_path.exists()):
+                # Skip if already scraped - in-memory set first, stat() only on a miss
+                if skip_already_scraped and (url in scraped_set or pine_path.exists()):
                     print(f"    Skipped (already done)")
                     results["skipped"] += 1
                     results["scripts"].append({"name": name, "url": url, "status": "skipped"})
                     continue
 
+                # Known URL whose content is already saved - no need to load the page
+                known_hash = url_index.get(normalize_url(url))
+                if known_hash and known_hash in hash_set:
+                    print(f"    Skipped (duplicate content)")
+                    results["duplicate"] += 1
+                    results["scripts"].append({"name": name, "url": url, "status": "duplicate"})
+                    continue
+
                 # Extract source code
                 code = extract_pine_source(page, url)
                 if code is None:
@@ -272,7 +320,9 @@ def scrape_category(
                     continue
 
                 # Check for duplicates
-                if is_duplicate(code, hashes):
+                if is_duplicate(code, hash_set):
+                    # Remember it so the next run skips this page without loading it
+                    url_index[normalize_url(url)] = compute_content_hash(code)
                     print(f"    Skipped (duplicate content)")
                     results["duplicate"] += 1
                     results["scripts"].append({"name": name, "url": url, "status": "duplicate"})
@@ -286,9 +336,12 @@ def scrape_category(
                 # Update state and hashes
                 content_hash = compute_content_hash(code)
                 hashes[slug] = content_hash
+                hash_set.add(content_hash)
                 save_hashes(hashes)
+                url_index[normalize_url(url)] = content_hash
 
                 state["scraped"].append(url)
+                scraped_set.add(url)
                 state["total_scraped"] = state.get("total_scraped", 0) + 1
 
                 results["saved"] += 1
@@ -297,6 +350,8 @@ def scrape_category(
             return results
 
         finally:
+            save_state(state)
+            save_url_index(url_index)
             browser.close()
 
 
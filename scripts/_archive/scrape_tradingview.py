@@ -16,6 +16,7 @@ Requirements:
 
 import argparse
 import json
+import os
 import re
 import sys
 import time
@@ -23,6 +24,12 @@ from pathlib import Path
 
 from playwright.sync_api import sync_playwright, Page, Browser
 
+# orjson is optional; it makes the per-script state rewrite much cheaper
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 PROJECT_ROOT = Path(__file__).parent.parent
 PINE_DIR = PROJECT_ROOT / "pinescript"
 
@@ -33,29 +40,80 @@ CATEGORY_URLS = {
     "trending": "https://www.tradingview.com/scripts/?sort=trending",
 }
 
+# Places TradingView renders Pine source, most specific first, joined so one
+# query returns them all
+_SOURCE_SELECTORS = [
+    '.pine-editor-view',
+    '[class*="sourceCode"]',
+    'pre.pine',
+    '.tv-chart-view__source-code',
+    '[data-name="pine-editor"]',
+    'code',
+]
+_SOURCE_SELECTOR = ", ".join(_SOURCE_SELECTORS)
+
+# The joined query returns matches in document order; tag each with the index
+# of the first selector it matches so the editor still beats an inline <code>
+# that appears earlier in the description
+_SOURCE_TEXTS_JS = """(els, selectors) => els.map(el => [
+    selectors.findIndex(s => el.matches(s)),
+    el.innerText.trim(),
+])"""
+
+# Any of these means the text is Pine source; one scan instead of three
+_PINE_MARKER = re.compile(r'indicator\(|strategy\(|//@version')
+
 # Tracks what we've already scraped
 STATE_FILE = PROJECT_ROOT / "results" / ".scrape_state.json"
+# Append-only log of ids scraped since the last compaction into STATE_FILE
+STATE_LOG = PROJECT_ROOT / "results" / ".scrape_state.log"
 
 
 def load_state() -> dict:
-    """Load scraping state (which scripts have been scraped)."""
+    """Load scraping state (which scripts have been scraped).
+
+    "scraped" is a set: the compacted JSON plus any ids still in the log.
+    """
+    state = {"scraped": []}
     if STATE_FILE.exists():
-        return json.loads(STATE_FILE.read_text())
-    return {"scraped": []}
+        if orjson is not None:
+            state = orjson.loads(STATE_FILE.read_bytes())
+        else:
+            state = json.loads(STATE_FILE.read_text())
+    state["scraped"] = set(state.get("scraped", []))
+    if STATE_LOG.exists():
+        with open(STATE_LOG, encoding="utf-8") as f:
+            state["scraped"].update(line.strip() for line in f if line.strip())
+    return state
 
 
 def save_state(state: dict) -> None:
-    """Persist scraping state."""
+    """Compact scraping state into STATE_FILE and drop the append log."""
     STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    STATE_FILE.write_text(json.dumps(state, indent=2))
+    data = {**state, "scraped": sorted(state["scraped"])}
+    # Write-then-rename: the log is only dropped once the full state is on disk
+    tmp = STATE_FILE.with_suffix(".tmp")
+    if orjson is not None:
+        tmp.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, STATE_FILE)
+    STATE_LOG.unlink(missing_ok=True)
+
+
+# A run of non-alphanumerics collapses to one "-" if it holds a space, "_" or
+# "-", and is dropped otherwise (pure punctuation)
+_SLUG_RUN_RE = re.compile(r"[\W_]+")
+_SLUG_SEP_RE = re.compile(r"[\s_-]")
+
+
+def _slug_run(match: re.Match) -> str:
+    return "-" if _SLUG_SEP_RE.search(match.group()) else ""
 
 
 def slugify(name: str) -> str:
     """Convert script name to a safe filename slug."""
-    slug = name.lower().strip()
-    slug = re.sub(r"[^\w\s-]", "", slug)
-    slug = re.sub(r"[\s_]+", "-", slug)
-    slug = re.sub(r"-+", "-", slug)
+    slug = _SLUG_RUN_RE.sub(_slug_run, name.lower().strip())
     return slug[:80]  # Limit length
 
 
@@ -82,10 +140,15 @@ def scrape_script_list(page: Page, category: str, limit: int = 0) -> list[dict]:
     """
     url = CATEGORY_URLS[category]
     print(f"\n  Navigating to {category}: {url}")
-    page.goto(url, wait_until="networkidle", timeout=30000)
-    time.sleep(2)
+    # The SPA rarely goes network-idle; wait for the first script card instead
+    page.goto(url, wait_until="domcontentloaded", timeout=30000)
+    try:
+        page.wait_for_selector('[class*="card-"]', timeout=10000)
+    except Exception:
+        pass
 
     scripts = []
+    seen: set[str] = set()
     scroll_count = 0
     max_scrolls = 50  # Safety limit
 
@@ -113,12 +176,14 @@ def scrape_script_list(page: Page, category: str, limit: int = 0) -> list[dict]:
                     href = f"https://www.tradingview.com{href}"
 
                 script_id = href.split("/script/")[-1].rstrip("/")
-                if script_id not in [s.get("id") for s in scripts]:
-                    scripts.append({
-                        "name": name,
-                        "url": href,
-                        "id": script_id,
-                    })
+                if script_id in seen:
+                    continue
+                seen.add(script_id)
+                scripts.append({
+                    "name": name,
+                    "url": href,
+                    "id": script_id,
+                })
             except Exception:
                 continue
 
@@ -145,32 +210,29 @@ def scrape_script_list(page: Page, category: str, limit: int = 0) -> list[dict]:
     return scripts
 
 
+def _source_texts(page: Page) -> list[str]:
+    """Text of every Pine source container, in _SOURCE_SELECTORS priority order."""
+    found = page.eval_on_selector_all(_SOURCE_SELECTOR, _SOURCE_TEXTS_JS, _SOURCE_SELECTORS)
+    return [text for _, text in sorted(found, key=lambda item: item[0])]
+
+
 def scrape_pine_source(page: Page, script_url: str) -> str | None:
     """Navigate to a script page and extract the Pine Script source code.
 
     Returns the source code string, or None if not available (closed source).
     """
     try:
-        page.goto(script_url, wait_until="networkidle", timeout=20000)
-        time.sleep(1)
+        page.goto(script_url, wait_until="domcontentloaded", timeout=20000)
+        try:
+            page.wait_for_selector(_SOURCE_SELECTOR, timeout=5000)
+        except Exception:
+            pass  # Closed source, or only reachable via the source tab below
 
         # Look for the source code section
         # TradingView shows source in a code editor or pre block
-        source_selectors = [
-            '.pine-editor-view',
-            '[class*="sourceCode"]',
-            'pre.pine',
-            '.tv-chart-view__source-code',
-            '[data-name="pine-editor"]',
-            'code',
-        ]
-
-        for selector in source_selectors:
-            elements = page.query_selector_all(selector)
-            for el in elements:
-                text = el.inner_text().strip()
-                if text and ("indicator(" in text or "strategy(" in text or "//@version" in text):
-                    return text
+        for text in _source_texts(page):
+            if text and _PINE_MARKER.search(text):
+                return text
 
         # Try clicking a "Source Code" or "Open Source" button/tab
         source_buttons = page.query_selector_all('button, [role="tab"]')
@@ -180,12 +242,9 @@ def scrape_pine_source(page: Page, script_url: str) -> str | None:
                 btn.click()
                 time.sleep(1)
                 # Re-check for source code
-                for selector in source_selectors:
-                    elements = page.query_selector_all(selector)
-                    for el in elements:
-                        text = el.inner_text().strip()
-                        if text and len(text) > 50:
-                            return text
+                for text in _source_texts(page):
+                    if text and len(text) > 50:
+                        return text
 
         return None  # Closed source or couldn't find it
 
@@ -201,7 +260,7 @@ def save_pine_script(pine_code: str, script_name: str, category: str) -> Path:
 
     filename = f"{slugify(script_name)}.pine"
     filepath = cat_dir / filename
-    filepath.write_text(pine_code, encoding="utf-8")
+    filepath.write_bytes(pine_code.encode("utf-8"))
     return filepath
 
 
@@ -227,47 +286,55 @@ def main():
         page = context.new_page()
 
         # Navigate to TradingView and ensure logged in
-        page.goto("https://www.tradingview.com/", wait_until="networkidle")
+        page.goto("https://www.tradingview.com/", wait_until="domcontentloaded")
         wait_for_login(page)
 
         total_scraped = 0
         total_skipped = 0
 
-        for category in categories:
-            print(f"\n{'='*60}")
-            print(f"Category: {category}")
-            print(f"{'='*60}")
-
-            # Get script list
-            scripts = scrape_script_list(page, category, limit=args.limit)
-
-            for i, script in enumerate(scripts, 1):
-                script_id = script["id"]
-
-                # Skip if already scraped
-                if script_id in state["scraped"]:
-                    total_skipped += 1
-                    continue
-
-                print(f"\n  [{i}/{len(scripts)}] {script['name']}")
-
-                # Scrape source code
-                pine_code = scrape_pine_source(page, script["url"])
-
-                if pine_code:
-                    filepath = save_pine_script(pine_code, script["name"], category)
-                    print(f"    Saved: {filepath.name} ({len(pine_code)} chars)")
-                    state["scraped"].append(script_id)
-                    save_state(state)
-                    total_scraped += 1
-                else:
-                    print(f"    Skipped (closed source or not found)")
-                    state["scraped"].append(script_id)  # Don't retry
-                    save_state(state)
-                    total_skipped += 1
-
-                # Rate limit
-                time.sleep(1)
+        # One line per scraped id; compacted into STATE_FILE on exit
+        STATE_LOG.parent.mkdir(parents=True, exist_ok=True)
+        state_log = open(STATE_LOG, "a", buffering=1, encoding="utf-8")
+
+        try:
+            for category in categories:
+                print(f"\n{'='*60}")
+                print(f"Category: {category}")
+                print(f"{'='*60}")
+
+                # Get script list
+                scripts = scrape_script_list(page, category, limit=args.limit)
+
+                for i, script in enumerate(scripts, 1):
+                    script_id = script["id"]
+
+                    # Skip if already scraped
+                    if script_id in state["scraped"]:
+                        total_skipped += 1
+                        continue
+
+                    print(f"\n  [{i}/{len(scripts)}] {script['name']}")
+
+                    # Scrape source code
+                    pine_code = scrape_pine_source(page, script["url"])
+
+                    if pine_code:
+                        filepath = save_pine_script(pine_code, script["name"], category)
+                        print(f"    Saved: {filepath.name} ({len(pine_code)} chars)")
+                        state["scraped"].add(script_id)
+                        state_log.write(script_id + "\n")
+                        total_scraped += 1
+                    else:
+                        print(f"    Skipped (closed source or not found)")
+                        state["scraped"].add(script_id)  # Don't retry
+                        state_log.write(script_id + "\n")
+                        total_skipped += 1
+
+                    # Rate limit
+                    time.sleep(1)
+        finally:
+            state_log.close()
+            save_state(state)
 
         browser.close()
 
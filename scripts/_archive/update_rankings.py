@@ -1,7 +1,8 @@
 """Update indicator rankings based on composite score.
 
 Fetches all indicators from ds_tv_indicators, assigns rank by composite_score
-(descending), updates the rank column via PostgREST, and prints a summary.
+(descending), updates the rank column with one PostgREST bulk upsert, and prints
+a summary.
 
 Usage:
     python scripts/update_rankings.py
@@ -14,7 +15,7 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from framework.supabase_sync import _get, _patch
+from framework.supabase_sync import _get, _upsert_many
 
 
 def update_rankings() -> list[dict]:
@@ -30,13 +31,22 @@ def update_rankings() -> list[dict]:
         return []
 
     for rank, ind in enumerate(indicators, 1):
-        _patch(
-            "ds_tv_indicators",
-            f"id=eq.{ind['id']}",
-            {"rank": rank},
-        )
         ind["rank"] = rank
 
+    # One bulk upsert instead of a PATCH per row. script_name and category
+    # are NOT NULL, so they ride along even though only rank changes.
+    # Unlike PATCH, an upsert inserts missing ids: a row deleted between the
+    # GET above and this POST comes back as a partial row. This one-off
+    # script is never run alongside deletes, so that window is accepted.
+    _upsert_many(
+        "ds_tv_indicators",
+        [
+            {"id": ind["id"], "script_name": ind["script_name"], "category": ind["category"], "rank": ind["rank"]}
+            for ind in indicators
+        ],
+        on_conflict="id",
+    )
+
     return indicators
 
 
@@ -8,13 +8,15 @@ This script:
 
 Usage:
     python scripts/ai_deduplicate.py
+    python scripts/ai_deduplicate.py --pretty
 """
 
+import argparse
 import hashlib
 import json
 import re
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, TextIO
 from collections import defaultdict
 from datetime import datetime
 
@@ -31,6 +33,10 @@ TYPE_KEYWORDS = {
     "library": ["library("]
 }
 
+# Script declaration line, e.g. `strategy("My Strategy", overlay=true)`
+DECL_RE = re.compile(r'^\s*(strategy|indicator|library)\s*\(', re.MULTILINE)
+DECL_HEAD_SIZE = 2048
+
 # Keywords for common indicators
 INDICATOR_KEYWORDS = {
     "RSI": ["rsi(", "relative strength"],
@@ -45,6 +51,12 @@ INDICATOR_KEYWORDS = {
 
 def extract_script_type(code: str) -> str:
     """Extract script type (strategy, indicator, library)."""
+    # The declaration call normally sits in the first couple of KB; only
+    # long license headers push it further down
+    match = DECL_RE.search(code, 0, DECL_HEAD_SIZE) or DECL_RE.search(code)
+    if match:
+        return match.group(1)
+
     for script_type, keywords in TYPE_KEYWORDS.items():
         for keyword in keywords:
             if keyword in code:
@@ -109,56 +121,57 @@ def analyze_script(pine_path: Path) -> Dict:
 
 def deduplicate_scripts(analyses: List[Dict]) -> Tuple[List[Dict], Dict]:
     """Deduplicate scripts based on logic and content."""
-    logic_groups = defaultdict(list)
-    content_groups = defaultdict(list)
+    # First path seen for each hash; only hashes seen again get a group list
+    logic_first = {}
+    content_first = {}
+    logic_groups = {}
+    content_groups = {}
 
-    # Group by logic hash
     for analysis in analyses:
-        logic_groups[analysis['logic_hash']].append(analysis)
-        content_groups[analysis['original_hash']].append(analysis)
-
-    # Find duplicates
-    logic_duplicates = []
-    content_duplicates = []
-
-    # Find logic duplicates
-    for logic_hash, scripts in logic_groups.items():
-        if len(scripts) > 1:
-            logic_duplicates.append({
-                'logic_hash': logic_hash,
-                'scripts': [s['path'] for s in scripts],
-                'count': len(scripts)
-            })
-
-    # Find exact content duplicates
-    for content_hash, scripts in content_groups.items():
-        if len(scripts) > 1:
-            content_duplicates.append({
-                'content_hash': content_hash,
-                'scripts': [s['path'] for s in scripts],
-                'count': len(scripts)
-            })
+        path = analysis['path']
+
+        logic_hash = analysis['logic_hash']
+        if logic_hash in logic_first:
+            logic_groups.setdefault(logic_hash, [logic_first[logic_hash]]).append(path)
+        else:
+            logic_first[logic_hash] = path
+
+        content_hash = analysis['original_hash']
+        if content_hash in content_first:
+            content_groups.setdefault(content_hash, [content_first[content_hash]]).append(path)
+        else:
+            content_first[content_hash] = path
+
+    # Emit groups in first-seen order of their hash, as before the single pass
+    logic_duplicates = [
+        {'logic_hash': h, 'scripts': logic_groups[h], 'count': len(logic_groups[h])}
+        for h in logic_first if h in logic_groups
+    ]
+    content_duplicates = [
+        {'content_hash': h, 'scripts': content_groups[h], 'count': len(content_groups[h])}
+        for h in content_first if h in content_groups
+    ]
 
     return logic_duplicates, content_duplicates
 
 
-def generate_report(analyses: List[Dict], logic_duplicates: List[Dict],
-                   content_duplicates: List[Dict]) -> str:
-    """Generate analysis report."""
-    report = "# AI-Powered Pine Script Analysis\n\n"
-    report += f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}\n\n"
+def write_report(analyses: List[Dict], logic_duplicates: List[Dict],
+                 content_duplicates: List[Dict], fp: TextIO) -> None:
+    """Write analysis report to an open text file."""
+    fp.write("# AI-Powered Pine Script Analysis\n\n")
+    fp.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}\n\n")
 
     # Overview
-    report += "## Overview\n\n"
-    report += f"- **Total Scripts:** {len(analyses)}\n"
+    fp.write("## Overview\n\n")
+    fp.write(f"- **Total Scripts:** {len(analyses)}\n")
 
     script_types = defaultdict(int)
     for analysis in analyses:
         script_types[analysis['type']] += 1
 
-    report += "- **By Type:**\n"
+    fp.write("- **By Type:**\n")
     for script_type, count in sorted(script_types.items()):
-        report += f"  - {script_type}: {count}\n"
+        fp.write(f"  - {script_type}: {count}\n")
 
     # Indicators
     all_indicators = defaultdict(int)
@@ -166,45 +179,47 @@ def generate_report(analyses: List[Dict], logic_duplicates: List[Dict],
         for indicator in analysis['indicators']:
             all_indicators[indicator] += 1
 
-    report += "\n- **Top Indicators:**\n"
+    fp.write("\n- **Top Indicators:**\n")
     for indicator, count in sorted(all_indicators.items(), key=lambda x: x[1], reverse=True)[:10]:
-        report += f"  - {indicator}: {count}\n"
+        fp.write(f"  - {indicator}: {count}\n")
 
     # Duplicates
-    report += "\n## Duplicates\n\n"
+    fp.write("\n## Duplicates\n\n")
 
-    report += f"### Logic Duplicates ({len(logic_duplicates)} groups)\n\n"
+    fp.write(f"### Logic Duplicates ({len(logic_duplicates)} groups)\n\n")
     for dup in logic_duplicates[:5]:  # Show first 5
-        report += f"- **Group:** {dup['count']} scripts with same logic\n"
+        fp.write(f"- **Group:** {dup['count']} scripts with same logic\n")
         for script in dup['scripts'][:2]:
-            report += f"  - {script}\n"
-        report += "\n"
+            fp.write(f"  - {script}\n")
+        fp.write("\n")
 
     if len(logic_duplicates) > 5:
-        report += f"... and {len(logic_duplicates) - 5} more groups\n\n"
+        fp.write(f"... and {len(logic_duplicates) - 5} more groups\n\n")
 
-    report += f"### Exact Content Duplicates ({len(content_duplicates)} groups)\n\n"
+    fp.write(f"### Exact Content Duplicates ({len(content_duplicates)} groups)\n\n")
     for dup in content_duplicates[:5]:  # Show first 5
-        report += f"- **Group:** {dup['count']} identical scripts\n"
+        fp.write(f"- **Group:** {dup['count']} identical scripts\n")
         for script in dup['scripts'][:2]:
-            report += f"  - {script}\n"
-        report += "\n"
+            fp.write(f"  - {script}\n")
+        fp.write("\n")
 
     if len(content_duplicates) > 5:
-        report += f"... and {len(content_duplicates) - 5} more groups\n\n"
+        fp.write(f"... and {len(content_duplicates) - 5} more groups\n\n")
 
     # Recommendations
-    report += "## Recommendations\n\n"
-    report += "1. **Remove Exact Duplicates**: " \
-              f"{sum(d['count'] - 1 for d in content_duplicates)} files\n"
-    report += "2. **Review Logic Duplicates**: " \
-              f"{len(logic_duplicates)} groups with similar logic\n"
-    report += "3. **Priority for Conversion**: Focus on strategies first\n\n"
-
-    return report
+    fp.write("## Recommendations\n\n")
+    fp.write("1. **Remove Exact Duplicates**: "
+             f"{sum(d['count'] - 1 for d in content_duplicates)} files\n")
+    fp.write("2. **Review Logic Duplicates**: "
+             f"{len(logic_duplicates)} groups with similar logic\n")
+    fp.write("3. **Priority for Conversion**: Focus on strategies first\n\n")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="AI-powered Pine Script deduplication")
+    parser.add_argument("--pretty", action="store_true", help="Indent the analysis JSON output")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("AI-Powered Pine Script Analysis & Deduplication")
     print("=" * 60)
@@ -231,24 +246,24 @@ def main():
     print(f"  Found {len(logic_duplicates)} logic duplicate groups")
     print(f"  Found {len(content_duplicates)} content duplicate groups")
 
-    # Generate report
-    print("\nGenerating report...")
-    report = generate_report(analyses, logic_duplicates, content_duplicates)
-
     # Save results
     print("\nSaving results...")
     RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 
-    with open(ANALYSIS_FILE, 'w') as f:
+    # Compact output unless --pretty; indentation dominates file size
+    dump_kwargs = {"indent": 2} if args.pretty else {"separators": (',', ':')}
+    with open(ANALYSIS_FILE, 'w', encoding='utf-8') as f:
         json.dump({
             "analyses": analyses,
             "logic_duplicates": logic_duplicates,
             "content_duplicates": content_duplicates,
             "timestamp": datetime.now().isoformat()
-        }, f, indent=2)
+        }, f, **dump_kwargs)
 
-    with open(DEDUP_LOG, 'w') as f:
-        f.write(report)
+    # Generate report
+    print("\nGenerating report...")
+    with open(DEDUP_LOG, 'w', encoding='utf-8') as f:
+        write_report(analyses, logic_duplicates, content_duplicates, f)
 
     print(f"  Analysis saved to: {ANALYSIS_FILE}")
     print(f"  Report saved to: {DEDUP_LOG}")
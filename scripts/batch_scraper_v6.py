@@ -1,7 +1,9 @@
 """Batch scraper v6 - Memory-optimized page-based scraping.
 
 Memory Optimizations:
-- Close browser after each page to free memory
+- One listing browser per category plus one per extractor worker (--workers)
+- Fresh context per listing page in every browser to free memory
+- Browsers relaunched every BROWSER_RELAUNCH_PAGES pages
 - Process scripts in smaller batches
 - Use lighter browser mode
 - Longer delays between pages
@@ -10,21 +12,34 @@ Memory Optimizations:
 Usage:
     python scripts/batch_scraper_v6.py --all
     python scripts/batch_scraper_v6.py --category oscillators --pages 1-5
+    python scripts/batch_scraper_v6.py --all --workers 8
 """
 
 import argparse
 import json
+import os
 import re
+import signal
 import sys
 import time
 import random
 import gc
+import hashlib
+import queue
+import threading
+from concurrent.futures import Future
 from pathlib import Path
 from datetime import datetime
 from urllib.parse import urljoin
 
 from playwright.sync_api import sync_playwright
 
+# orjson is optional; it makes the frequent state/hashes rewrites much cheaper
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 PROJECT_ROOT = Path(__file__).parent.parent
 PINE_DIR = PROJECT_ROOT / "pinescript"
 COOKIES_FILE = PROJECT_ROOT / "results" / ".tv_cookies.json"
@@ -32,6 +47,87 @@ STATE_FILE = PROJECT_ROOT / "results" / ".scrape_state_v6.json"
 HASHES_FILE = PROJECT_ROOT / "results" / ".script_hashes_v6.json"
 PROGRESS_FILE = PROJECT_ROOT / "results" / ".scrape_progress_v6.json"
 
+# Present once a script page has rendered its source code (or the tab for it)
+SOURCE_READY_SELECTOR = (
+    'pre, code, [class*="sourceCode"], '
+    'button:has-text("Source code"), [role="tab"]:has-text("Source code")'
+)
+
+# Installed on every page via add_init_script so V8 parses it once per context.
+# window.__tvExtract() returns {open, code}: reads body text once for the
+# open-source check, then takes the smallest Pine-looking text, skipping
+# containers that wrap page nav
+EXTRACTOR_INIT_JS = """window.__tvExtract = () => {
+    const bodyText = document.body.textContent;
+    if (!/open-source script/i.test(bodyText)) return {open: false, code: null};
+
+    // textContent is only a cheap screen - the winning node is read with
+    // innerText, which keeps <br>/block line breaks and skips hidden text
+    let bestNode = null;
+    let bestLength = Infinity;
+    const consider = (node) => {
+        const text = node.textContent;
+        if (!text || !text.includes('//@version')) return;
+        if (text.length > 500000) return;
+        if (!(text.includes('indicator(') || text.includes('strategy(') || text.includes('library('))) return;
+        if (text.includes('Products') && text.includes('Brokers')) return;
+        if (text.length < bestLength) {
+            bestNode = node;
+            bestLength = text.length;
+        }
+    };
+
+    // Code containers first - a handful of nodes instead of the whole tree
+    const candidates = document.querySelectorAll(
+        'pre, code, [class*="sourceCode"], [class*="codeBlock"]'
+    );
+    candidates.forEach(consider);
+    if (bestNode !== null) return {open: true, code: bestNode.innerText};
+
+    // Unknown container - fall back to walking every element
+    const walker = document.createTreeWalker(
+        document.body, NodeFilter.SHOW_ELEMENT, null
+    );
+
+    let node;
+    while (node = walker.nextNode()) {
+        consider(node);
+    }
+
+    return {open: true, code: bestNode !== null ? bestNode.innerText : null};
+};"""
+
+SOURCE_EXTRACT_JS = "() => window.__tvExtract()"
+
+# Requests the extractor never needs: static assets and analytics beacons
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+BLOCKED_HOSTS_RE = re.compile(r"google-analytics|googletagmanager|doubleclick|hotjar|amplitude")
+
+# Relaunch Chromium after this many pages to bound memory growth
+BROWSER_RELAUNCH_PAGES = 50
+
+# Attempts per extractor browser launch before that worker gives up
+LAUNCH_ATTEMPTS = 3
+
+# Concurrent script-page extractors per category
+DEFAULT_WORKERS = 4
+
+# Flush state and hashes to disk after this many saved scripts
+SAVE_EVERY = 25
+
+# Back off only when the server pushes back: pause every worker for
+# BACKOFF_START seconds on a 429/503, double the pause for each further
+# throttling episode, and start over once the server has been quiet for
+# BACKOFF_MAX seconds
+BACKOFF_STATUSES = {429, 503}
+BACKOFF_START = 2.0
+BACKOFF_MAX = 60.0
+
+# Rewrite the progress file every N scripts, or sooner if this many seconds passed
+PROGRESS_EVERY = 5
+PROGRESS_INTERVAL = 2.0
+_last_progress_ts = 0.0
+
 CATEGORY_URLS = {
     "editors_picks": "https://www.tradingview.com/scripts/editors-picks/",
     "top": "https://www.tradingview.com/scripts/?sort=top",
@@ -51,81 +147,127 @@ PRIORITY_CATEGORIES = {
 }
 
 
+_SLUG_RE1 = re.compile(r"[^\w\s-]")
+_SLUG_RE2 = re.compile(r"[\s_]+")
+_SLUG_RE3 = re.compile(r"-+")
+
+
 def slugify(name: str) -> str:
     slug = name.lower().strip()
-    slug = re.sub(r"[^\w\s-]", "", slug)
-    slug = re.sub(r"[\s_]+", "-", slug)
-    slug = re.sub(r"-+", "-", slug).strip("-")
+    slug = _SLUG_RE1.sub("", slug)
+    slug = _SLUG_RE2.sub("-", slug)
+    slug = _SLUG_RE3.sub("-", slug).strip("-")
     return slug[:80]
 
 
+def dump_json(obj) -> bytes:
+    """Serialize to indented JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
+def load_json(data):
+    """Parse JSON from str or bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write via a temp file and rename so an interrupted write never truncates the file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def migrate_hashes(slug_to_hash: dict) -> dict:
+    """Build the two-way hashes layout from a legacy {slug: hash} mapping."""
+    by_slug = {slug: h for slug, h in slug_to_hash.items() if isinstance(h, str)}
+    by_hash = {}
+    for slug, h in by_slug.items():
+        by_hash.setdefault(h, slug)
+    return {"by_hash": by_hash, "by_slug": by_slug}
+
+
 def load_hashes() -> dict:
+    """Load hashes as {"by_hash": {hash: slug}, "by_slug": {slug: hash}}."""
     if not HASHES_FILE.exists():
         print(f"Hashes file not found, creating new one: {HASHES_FILE}")
-        return {}
+        return migrate_hashes({})
 
     try:
         content = HASHES_FILE.read_text()
         if not content.strip():
-            return {}
+            return migrate_hashes({})
 
-        data = json.loads(content)
+        data = load_json(content)
 
         if isinstance(data, list):
             print(f"⚠️  Converting list to dict...")
-            hashes = {}
+            flat = {}
             for item in data:
                 if isinstance(item, dict):
-                    hashes.update(item)
+                    flat.update(item)
                 elif isinstance(item, str):
-                    hashes[item] = item
+                    flat[item] = item
+            hashes = migrate_hashes(flat)
             save_hashes(hashes)
             return hashes
         elif isinstance(data, dict):
-            print(f"✅ Hashes loaded: {len(data)} entries")
-            return data
+            if "by_hash" in data and "by_slug" in data:
+                print(f"✅ Hashes loaded: {len(data['by_slug'])} entries")
+                return data
+            print(f"⚠️  Migrating {len(data)} hashes to by_hash/by_slug layout...")
+            hashes = migrate_hashes(data)
+            save_hashes(hashes)
+            return hashes
         else:
-            return {}
+            return migrate_hashes({})
 
     except Exception as e:
         print(f"❌ Error loading hashes: {e}")
-        return {}
+        return migrate_hashes({})
 
 
 def save_hashes(hashes: dict):
     if not isinstance(hashes, dict):
-        hashes = {}
-
-    HASHES_FILE.parent.mkdir(parents=True, exist_ok=True)
-    HASHES_FILE.write_text(json.dumps(hashes, indent=2))
+        hashes = migrate_hashes({})
+    elif "by_hash" not in hashes:
+        # Legacy flat {slug: hash} map - convert instead of dropping it
+        hashes = migrate_hashes(hashes)
 
+    write_atomic(HASHES_FILE, dump_json(hashes))
 
-def compute_content_hash(pine_code: str) -> str:
-    import hashlib
-    return hashlib.sha256(pine_code.encode('utf-8')).hexdigest()
-
-
-def is_duplicate(pine_code: str, hashes: dict) -> bool:
-    if not isinstance(hashes, dict):
-        return False
 
-    content_hash = compute_content_hash(pine_code)
-    return content_hash in hashes.values()
+def compute_content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
 
 
 def load_state() -> dict:
     if STATE_FILE.exists():
-        return json.loads(STATE_FILE.read_text())
+        return load_json(STATE_FILE.read_bytes())
     return {"scraped": [], "failed": [], "last_run": None, "total_scraped": 0}
 
 
 def save_state(state: dict):
     state["last_run"] = datetime.now().isoformat()
-    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    STATE_FILE.write_text(json.dumps(state, indent=2))
+    write_atomic(STATE_FILE, dump_json(state))
 
 
 def update_progress(category: str, page: int, total_pages: int, script_num: int, total_scripts: int, status: str = "running"):
+    """Write the progress file; running updates are throttled, final ones always written."""
+    global _last_progress_ts
+    now = time.monotonic()
+    if (
+        status == "running"
+        and script_num % PROGRESS_EVERY != 0
+        and now - _last_progress_ts < PROGRESS_INTERVAL
+    ):
+        return
+    _last_progress_ts = now
+
     progress = {
         "category": category,
         "page": page,
@@ -137,7 +279,7 @@ def update_progress(category: str, page: int, total_pages: int, script_num: int,
     }
 
     PROGRESS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    PROGRESS_FILE.write_text(json.dumps(progress, indent=2))
+    PROGRESS_FILE.write_bytes(dump_json(progress))
 
 
 def detect_total_pages(page) -> int:
@@ -184,7 +326,11 @@ def detect_total_pages(page) -> int:
 
 def collect_scripts_from_page(page, url: str) -> list[dict]:
     """Collect scripts from a single page."""
-    page.goto(url, wait_until="networkidle", timeout=30000)
+    page.goto(url, wait_until="domcontentloaded", timeout=30000)
+    try:
+        page.wait_for_selector('article a[href*="/script/"]', timeout=10000)
+    except Exception:
+        pass
     time.sleep(random.uniform(0.5, 1.0))
 
     scripts = page.evaluate("""() => {
@@ -216,50 +362,28 @@ def extract_pine_source(page, script_url: str, max_retries: int = 2) -> str | No
     """Navigate to a script page and extract Pine Script source code."""
     for attempt in range(max_retries):
         try:
-            page.goto(script_url, wait_until="networkidle", timeout=20000)
-            time.sleep(random.uniform(0.3, 0.8))
-
-            is_open = page.evaluate("""() => {
-                return document.body.textContent.includes('OPEN-SOURCE SCRIPT') ||
-                       document.body.textContent.includes('Open-source script');
-            }""")
-
-            if not is_open:
-                return None
-
+            page.goto(script_url, wait_until="domcontentloaded", timeout=20000)
             try:
-                source_tab = page.locator('button:has-text("Source code"), [role="tab"]:has-text("Source code")')
-                if source_tab.is_visible(timeout=2000):
-                    source_tab.click()
-                    time.sleep(0.5)
+                # Gate on the source container (or its tab) rather than network idle
+                page.wait_for_selector(SOURCE_READY_SELECTOR, timeout=5000)
             except Exception:
                 pass
+            # One round trip answers both "is it open source?" and "what is the code?"
+            result = page.evaluate(SOURCE_EXTRACT_JS)
+            if not result["open"]:
+                return None
 
-            code = page.evaluate("""() => {
-                let bestMatch = null;
-                let bestSize = Infinity;
-
-                const walker = document.createTreeWalker(
-                    document.body, NodeFilter.SHOW_ELEMENT, null
-                );
-
-                let node;
-                while (node = walker.nextNode()) {
-                    const text = node.innerText;
-                    if (!text || !text.includes('//@version')) continue;
-                    if (text.length > 500000) continue;
-
-                    if (text.includes('indicator(') || text.includes('strategy(') || text.includes('library(')) {
-                        const hasNav = text.includes('Products') && text.includes('Brokers');
-                        if (!hasNav && text.length < bestSize) {
-                            bestSize = text.length;
-                            bestMatch = text;
-                        }
-                    }
-                }
-
-                return bestMatch;
-            }""")
+            code = result["code"]
+            if not code:
+                # Source not in the DOM yet - open its tab and look again
+                try:
+                    source_tab = page.locator('button:has-text("Source code"), [role="tab"]:has-text("Source code")')
+                    if source_tab.is_visible(timeout=2000):
+                        source_tab.click()
+                        time.sleep(0.5)
+                except Exception:
+                    pass
+                code = page.evaluate(SOURCE_EXTRACT_JS)["code"]
 
             if code:
                 code = code.replace("\u00a0", " ")
@@ -276,108 +400,337 @@ def extract_pine_source(page, script_url: str, max_retries: int = 2) -> str | No
     return None
 
 
+def block_unneeded(route):
+    """Abort asset and analytics requests; let documents, scripts and XHR through."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_HOSTS_RE.search(request.url):
+        route.abort()
+    else:
+        route.continue_()
+
+
+def new_context(browser, storage_state: dict = None):
+    """Create a lightweight browser context seeded with the session storage state."""
+    context = browser.new_context(
+        viewport={"width": 1280, "height": 800},  # Reduced from 1920x1080
+        user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+        storage_state=storage_state,
+    )
+    context.route("**/*", block_unneeded)
+    context.add_init_script(script=EXTRACTOR_INIT_JS)
+    return context
+
+
+class Backoff:
+    """Delay driven by server throttling signals instead of fixed sleeps.
+
+    Shared by the listing page and every extractor worker: a 429/503 sets
+    one resume-at deadline that all callers of wait() sleep until.
+    """
+
+    def __init__(self):
+        self.backoff = 0.0
+        self._resume_at = None
+        self._lock = threading.Lock()
+
+    def on_response(self, response):
+        """page.on("response") handler: push the resume deadline out on 429/503."""
+        if response.status not in BACKOFF_STATUSES:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._resume_at is not None:
+                if now < self._resume_at:
+                    # Requests already in flight when the pause started
+                    return
+                if now - self._resume_at > BACKOFF_MAX:
+                    self.backoff = 0.0
+            self.backoff = min(max(self.backoff * 2, BACKOFF_START), BACKOFF_MAX)
+            self._resume_at = now + self.backoff
+
+    def watch(self, page):
+        page.on("response", self.on_response)
+        return page
+
+    def wait(self):
+        """Sleep until the shared resume deadline, if it is still ahead."""
+        with self._lock:
+            resume_at = self._resume_at
+        if resume_at is None:
+            return
+        delay = resume_at - time.monotonic()
+        if delay > 0:
+            print(f"    Server throttling - backing off {delay:.1f}s")
+            time.sleep(delay)
+
+
+class ExtractorPool:
+    """Worker threads that extract Pine source from script pages concurrently.
+
+    Playwright's sync API is bound to the thread that started it, so each
+    worker owns its own Playwright instance and browser. Workers live for
+    the whole category and pull script URLs from a shared queue; each one
+    opens a fresh context per listing page (see recycle()) and relaunches
+    its browser every BROWSER_RELAUNCH_PAGES script pages. A worker whose
+    browser cannot be launched exits and leaves the queue to the others;
+    queued jobs fail only once no worker is left.
+    """
+
+    def __init__(self, workers: int, storage_state: dict = None, backoff: Backoff = None):
+        self._jobs = queue.Queue()
+        self._backoff = backoff or Backoff()
+        self._closing = threading.Event()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._live = workers
+        self._threads = [
+            threading.Thread(target=self._run, args=(storage_state,), daemon=True)
+            for _ in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @staticmethod
+    def _launch(p):
+        """Launch Chromium, retrying a few times; None if it never starts."""
+        for attempt in range(1, LAUNCH_ATTEMPTS + 1):
+            try:
+                return p.chromium.launch(headless=True)
+            except Exception as e:
+                print(f"    Extractor browser launch failed ({attempt}/{LAUNCH_ATTEMPTS}): {e}")
+                if attempt < LAUNCH_ATTEMPTS:
+                    time.sleep(attempt * 2)
+        return None
+
+    def _run(self, storage_state: dict):
+        try:
+            with sync_playwright() as p:
+                browser = self._launch(p)
+                context = page = None
+                generation = None
+                jobs = 0
+
+                try:
+                    while browser is not None:
+                        job = self._jobs.get()
+                        if job is None:
+                            return
+                        url, future = job
+                        if self._closing.is_set():
+                            future.cancel()
+                            continue
+
+                        # Relaunch Chromium periodically to cap long-run memory growth
+                        if jobs and jobs % BROWSER_RELAUNCH_PAGES == 0:
+                            browser.close()
+                            context = None
+                            browser = self._launch(p)
+                            if browser is None:
+                                # Hand the job back to the remaining workers
+                                self._jobs.put(job)
+                                break
+
+                        if not future.set_running_or_notify_cancel():
+                            continue
+                        try:
+                            # Fresh context for each listing page's scripts
+                            if context is None or generation != self._generation:
+                                if context is not None:
+                                    context.close()
+                                    gc.collect()
+                                context = new_context(browser, storage_state)
+                                page = self._backoff.watch(context.new_page())
+                                generation = self._generation
+                            jobs += 1
+                            self._backoff.wait()
+                            future.set_result(extract_pine_source(page, url))
+                        except Exception as e:
+                            future.set_exception(e)
+                finally:
+                    if browser is not None:
+                        browser.close()
+        except Exception as e:
+            print(f"    Extractor worker failed: {e}")
+        finally:
+            self._worker_exited()
+
+    def _worker_exited(self):
+        with self._lock:
+            self._live -= 1
+            if self._live:
+                return
+            # Nobody is left to serve the queue - settle whatever is still in it
+            if not self._closing.is_set():
+                print("    No extractor workers left")
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    continue
+                future = job[1]
+                if self._closing.is_set():
+                    future.cancel()
+                elif future.set_running_or_notify_cancel():
+                    future.set_exception(RuntimeError("no extractor workers left"))
+
+    def submit(self, url: str) -> Future:
+        future = Future()
+        with self._lock:
+            if self._live:
+                self._jobs.put((url, future))
+            else:
+                future.set_exception(RuntimeError("no extractor workers left"))
+        return future
+
+    def recycle(self):
+        """Have each worker start a fresh context before its next script page."""
+        self._generation += 1
+
+    def close(self):
+        """Stop the workers, cancelling extractions that have not started yet."""
+        self._closing.set()
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job[1].cancel()
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
 def scrape_category(
     category: str,
     max_pages: int = 0,
     skip_already_scraped: bool = True,
-    cookies: list = None
+    storage_state: dict = None,
+    workers: int = DEFAULT_WORKERS,
+    state: dict = None,
+    hashes: dict = None
 ) -> dict:
-    """Scrape all pages of a category (memory-optimized)."""
+    """Scrape all pages of a category (memory-optimized).
+
+    State and hashes are updated in place and flushed every SAVE_EVERY
+    saved scripts and once more on exit, including on errors.
+    """
     print(f"\n{'='*60}")
     print(f"Category: {category}")
     print(f"{'='*60}")
 
     base_url = CATEGORY_URLS[category]
 
-    # First visit to detect total pages
+    if state is None:
+        state = load_state()
+    if hashes is None:
+        hashes = load_hashes()
+    unsaved = 0
+
     with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=True,
-            # Reduced viewport for less memory
-        )
-        context = browser.new_context(
-            viewport={"width": 1280, "height": 800},  # Reduced from 1920x1080
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-        )
-        if cookies:
-            context.add_cookies(cookies)
-        page = context.new_page()
+        browser = p.chromium.launch(headless=True)
+        pool = None
 
         try:
-            print(f"\nDetecting total pages for {category}...")
-            page.goto(base_url, wait_until="networkidle", timeout=30000)
-            time.sleep(random.uniform(1, 2))
+            # First visit to detect total pages
+            context = new_context(browser, storage_state)
+            page = context.new_page()
 
             try:
-                dont_need = page.locator("button:has-text('Don\\'t need')")
-                if dont_need.is_visible(timeout=3000):
-                    dont_need.click()
-                    time.sleep(1)
-            except Exception:
-                pass
+                print(f"\nDetecting total pages for {category}...")
+                page.goto(base_url, wait_until="networkidle", timeout=30000)
+                time.sleep(random.uniform(1, 2))
 
-            total_pages = detect_total_pages(page)
+                try:
+                    dont_need = page.locator("button:has-text('Don\\'t need')")
+                    if dont_need.is_visible(timeout=3000):
+                        dont_need.click()
+                        time.sleep(1)
+                except Exception:
+                    pass
 
-            if max_pages > 0 and max_pages < total_pages:
-                total_pages = max_pages
+                total_pages = detect_total_pages(page)
 
-            print(f"  Will scrape {total_pages} pages")
+                if max_pages > 0 and max_pages < total_pages:
+                    total_pages = max_pages
 
-        finally:
-            browser.close()
-            # Force garbage collection
-            gc.collect()
+                print(f"  Will scrape {total_pages} pages")
 
-    # Now scrape pages one by one, closing browser after each page
-    state = load_state()
-    hashes = load_hashes()
-    category_dir = PINE_DIR / category
-    category_dir.mkdir(parents=True, exist_ok=True)
-
-    results = {
-        "saved": 0,
-        "skipped": 0,
-        "duplicate": 0,
-        "closed": 0,
-        "failed": 0,
-        "scripts": []
-    }
-
-    total_scripts = 0
-    total_processed = 0
-
-    for page_num in range(1, total_pages + 1):
-        # Build page URL
-        if page_num == 1:
-            page_url = base_url
-        else:
-            if '?' in base_url:
-                page_url = f"{base_url}&page={page_num}"
-            else:
-                page_url = f"{base_url.rstrip('/')}/page-{page_num}/"
-
-        print(f"\n  [Page {page_num}/{total_pages}] {page_url}")
+            finally:
+                context.close()
+                # Force garbage collection
+                gc.collect()
 
-        # Open browser for this page only
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-            )
-            context = browser.new_context(
-                viewport={"width": 1280, "height": 800},
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-            )
-            if cookies:
-                context.add_cookies(cookies)
-            page = context.new_page()
+            # Now scrape pages one by one, closing the listing context after each page
+            category_dir = PINE_DIR / category
+            category_dir.mkdir(parents=True, exist_ok=True)
+            # One directory read instead of a stat() per script
+            existing = {e.name[:-5] for e in os.scandir(category_dir) if e.name.endswith(".pine")}
+
+            results = {
+                "saved": 0,
+                "skipped": 0,
+                "duplicate": 0,
+                "closed": 0,
+                "failed": 0,
+                "scripts": []
+            }
+
+            total_scripts = 0
+            total_processed = 0
+
+            # Shared by the listing pages and every extractor worker
+            backoff = Backoff()
+            pool = ExtractorPool(workers, storage_state, backoff)
+
+            for page_num in range(1, total_pages + 1):
+                # Build page URL
+                if page_num == 1:
+                    page_url = base_url
+                else:
+                    if '?' in base_url:
+                        page_url = f"{base_url}&page={page_num}"
+                    else:
+                        page_url = f"{base_url.rstrip('/')}/page-{page_num}/"
+
+                print(f"\n  [Page {page_num}/{total_pages}] {page_url}")
+
+                # Relaunch the browser periodically to cap long-run memory growth
+                if page_num > 1 and (page_num - 1) % BROWSER_RELAUNCH_PAGES == 0:
+                    browser.close()
+                    browser = p.chromium.launch(headless=True)
+                    print(f"    Browser relaunched after {page_num - 1} pages")
+
+                # Fresh context for this listing page only
+                context = new_context(browser, storage_state)
+                page = backoff.watch(context.new_page())
+
+                try:
+                    backoff.wait()
+                    scripts = collect_scripts_from_page(page, page_url)
+                finally:
+                    context.close()
+                    # Force garbage collection after each page
+                    gc.collect()
 
-            try:
-                # Collect scripts from this page
-                scripts = collect_scripts_from_page(page, page_url)
                 print(f"    Found {len(scripts)} scripts")
                 total_scripts += len(scripts)
 
-                # Process each script
+                # Queue extraction for every script not already scraped
+                pending = {}
+                for script in scripts:
+                    url = script["url"]
+                    if skip_already_scraped and (
+                        url in state["scraped"] or slugify(script["name"]) in existing
+                    ):
+                        continue
+                    if url not in pending:
+                        pending[url] = pool.submit(url)
+
+                # Process each script in listing order as its extraction completes
                 for i, script in enumerate(scripts, 1):
                     total_processed += 1
                     name = script["name"]
@@ -391,50 +744,73 @@ def scrape_category(
                     if i % 3 == 0 or i == len(scripts):
                         print(f"    [{i}/{len(scripts)}] {name[:50]}")
 
-                    if skip_already_scraped and (url in state["scraped"] or pine_path.exists()):
+                    if url not in pending or (
+                        skip_already_scraped and (url in state["scraped"] or slug in existing)
+                    ):
                         results["skipped"] += 1
                         results["scripts"].append({"name": name, "url": url, "status": "skipped"})
                         continue
 
-                    code = extract_pine_source(page, url)
+                    try:
+                        code = pending[url].result()
+                    except Exception as e:
+                        print(f"      Failed: {e}")
+                        results["failed"] += 1
+                        results["scripts"].append({"name": name, "url": url, "status": "failed"})
+                        continue
+
                     if code is None:
                         print(f"      Skipped (closed source)")
                         results["closed"] += 1
                         results["scripts"].append({"name": name, "url": url, "status": "closed"})
                         continue
 
-                    if is_duplicate(code, hashes):
-                        print(f"      Skipped (duplicate)")
+                    # Encode once; the same bytes are hashed and written
+                    data = code.encode('utf-8')
+                    content_hash = compute_content_hash(data)
+
+                    existing_slug = hashes["by_hash"].get(content_hash)
+                    if existing_slug is not None:
+                        print(f"      Skipped (duplicate of {existing_slug}.pine)")
                         results["duplicate"] += 1
                         results["scripts"].append({"name": name, "url": url, "status": "duplicate"})
                         continue
 
                     lines = code.count("\n") + 1
-                    pine_path.write_text(code, encoding='utf-8')
+                    pine_path.write_bytes(data)
                     print(f"      Saved: {slug}.pine ({lines} lines)")
+                    existing.add(slug)
 
-                    content_hash = compute_content_hash(code)
-                    hashes[slug] = content_hash
-                    save_hashes(hashes)
+                    hashes["by_slug"][slug] = content_hash
+                    hashes["by_hash"][content_hash] = slug
 
                     state["scraped"].append(url)
                     state["total_scraped"] = state.get("total_scraped", 0) + 1
 
+                    unsaved += 1
+                    if unsaved >= SAVE_EVERY:
+                        save_hashes(hashes)
+                        save_state(state)
+                        unsaved = 0
+
                     results["saved"] += 1
                     results["scripts"].append({"name": name, "url": url, "status": "saved"})
 
-            finally:
-                browser.close()
-                # Force garbage collection after each page
-                gc.collect()
+                # Workers drop this page's contexts before the next page's scripts
+                pool.recycle()
 
-        # Longer delay between pages
-        time.sleep(random.uniform(2, 4))
+                # Every 10 pages, force an extra GC
+                if page_num % 10 == 0:
+                    gc.collect()
+                    print(f"    Memory cleanup after {page_num} pages")
 
-        # Every 10 pages, force an extra GC
-        if page_num % 10 == 0:
-            gc.collect()
-            print(f"    Memory cleanup after {page_num} pages")
+        finally:
+            if unsaved:
+                save_hashes(hashes)
+                save_state(state)
+            if pool is not None:
+                pool.close()
+            browser.close()
 
     # Mark as completed
     update_progress(category, total_pages, total_pages, total_processed, total_scripts, "completed")
@@ -445,7 +821,8 @@ def scrape_category(
 def scrape_categories(
     categories: list[str],
     max_pages_per_category: int = 0,
-    skip_already_scraped: bool = True
+    skip_already_scraped: bool = True,
+    workers: int = DEFAULT_WORKERS
 ) -> dict:
     """Scrape multiple categories."""
     print("=" * 60)
@@ -455,14 +832,20 @@ def scrape_categories(
     print(f"  Categories: {', '.join(categories)}")
     print(f"  Max pages per category: {max_pages_per_category if max_pages_per_category > 0 else 'ALL'}")
     print(f"  Skip already scraped: {skip_already_scraped}")
-    print(f"  Memory mode: OPTIMIZED (close browser each page)")
+    print(f"  Extractor workers: {workers}")
+    print(f"  Memory mode: OPTIMIZED (close context each page)")
 
     if not COOKIES_FILE.exists():
         print(f"\nERROR: No cookies file at {COOKIES_FILE}")
         return {"error": "No cookies file"}
 
     cookies = json.loads(COOKIES_FILE.read_text())
-    print(f"\n✅ Cookies loaded ({len(cookies)} cookies)")
+    # Build the storage state once; every context is created from it directly
+    if isinstance(cookies, dict) and "cookies" in cookies:
+        storage_state = cookies
+    else:
+        storage_state = {"cookies": cookies, "origins": []}
+    print(f"\n✅ Cookies loaded ({len(storage_state['cookies'])} cookies)")
 
     state = load_state()
     hashes = load_hashes()
@@ -478,7 +861,10 @@ def scrape_categories(
                 category=cat,
                 max_pages=max_pages_per_category,
                 skip_already_scraped=skip_already_scraped,
-                cookies=cookies
+                storage_state=storage_state,
+                workers=workers,
+                state=state,
+                hashes=hashes
             )
             all_results[cat] = results
             save_state(state)
@@ -526,7 +912,14 @@ def main():
     parser.add_argument("--all", action="store_true", help="Scrape all categories")
     parser.add_argument("--categories", nargs="+", choices=list(CATEGORY_URLS.keys()))
     parser.add_argument("--pages", type=int, default=0, help="Max pages per category (0 = all)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent script extractors (each runs its own Chromium)")
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    # Turn SIGTERM (e.g. from auto_restart.sh) into a normal exit so pending
+    # state and hashes are flushed by scrape_category's cleanup
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
 
     if args.all:
         categories = list(CATEGORY_URLS.keys())
@@ -542,6 +935,7 @@ def main():
         categories=categories,
         max_pages_per_category=args.pages,
         skip_already_scraped=True,
+        workers=args.workers,
     )
 
 
@@ -11,10 +11,23 @@ Usage:
 
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, TextIO, Tuple
 from datetime import datetime
 
+# orjson is optional; it parses the analysis file faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson is optional; with it the analysis file is streamed instead of loaded whole
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 PROJECT_ROOT = Path(__file__).parent.parent
 PINE_DIR = PROJECT_ROOT / "pinescript"
 PYTHON_DIR = PROJECT_ROOT / "backtests"
@@ -22,78 +35,96 @@ RESULTS_DIR = PROJECT_ROOT / "results"
 ANALYSIS_FILE = RESULTS_DIR / "ai_analysis.json"
 CONVERSION_LOG = RESULTS_DIR / "conversion_log.md"
 
+# Threads used to write converted strategies once generation is done
+WRITE_WORKERS = 8
+
+# Compiled once; these run against every converted script. Byte patterns: the
+# markers are ASCII, so raw file bytes can be scanned without decoding the script
+_STRATEGY_NAME_RE = re.compile(rb'strategy\s*\(\s*["\']([^"\']+)["\']', re.IGNORECASE)
+_INPUT_RE = re.compile(rb'input\s*\([^)]+\)', re.IGNORECASE)
+
+# Common Pine Script indicator calls: a whole-word name, optional spaces, "(".
+# One case-insensitive scan of the original text, no lowercased copy
+_INDICATOR_RE = re.compile(
+    r'\b(sma|ema|rsi|macd|bb|atr|stoch|wma|hull|vwma|vwap)\s*\(', re.IGNORECASE
+)
+
 
 def load_analysis() -> Dict:
     """Load AI analysis results."""
     if ANALYSIS_FILE.exists():
+        if orjson is not None:
+            return orjson.loads(ANALYSIS_FILE.read_bytes())
         return json.loads(ANALYSIS_FILE.read_text())
     return {}
 
 
-def find_unique_scripts(analysis: Dict) -> List[Dict]:
-    """Find unique scripts (no exact duplicates)."""
-    content_hashes = set()
-    unique_scripts = []
+def iter_analyses() -> Iterator[Dict]:
+    """Yield each entry of the analysis file's "analyses" list."""
+    if not ANALYSIS_FILE.exists():
+        return
+    if ijson is not None:
+        with open(ANALYSIS_FILE, 'rb') as f:
+            yield from ijson.items(f, 'analyses.item')
+    else:
+        yield from load_analysis().get('analyses', [])
 
-    for script_analysis in analysis.get('analyses', []):
-        content_hash = script_analysis['original_hash']
-        if content_hash not in content_hashes:
-            content_hashes.add(content_hash)
-            unique_scripts.append(script_analysis)
 
-    return unique_scripts
+def find_unique_scripts(analyses: Iterable[Dict], script_type: str = 'strategy') -> Tuple[List[Dict], int]:
+    """Find unique scripts of one type (no exact duplicates).
+
+    The first analysis seen for each content hash wins, in input order.
+    Returns the unique scripts and the number of unique scripts of other
+    types that were skipped.
+    """
+    unique_scripts = {}
+    other_hashes = set()
+    for script_analysis in analyses:
+        content_hash = script_analysis['original_hash']
+        if script_analysis.get('type', 'indicator') != script_type:
+            other_hashes.add(content_hash)
+            continue
+        unique_scripts.setdefault(content_hash, script_analysis)
+    return list(unique_scripts.values()), len(other_hashes)
 
 
-def read_pine_script(pine_path: str) -> str:
-    """Read Pine Script content."""
-    return Path(pine_path).read_text(encoding='utf-8')
+def read_pine_bytes(pine_path: str) -> bytes:
+    """Read raw Pine Script bytes."""
+    return Path(pine_path).read_bytes()
 
 
-def extract_strategy_params(code: str) -> Dict:
-    """Extract strategy parameters from Pine Script."""
+def extract_strategy_params(code: bytes) -> Dict:
+    """Extract strategy parameters from raw UTF-8 Pine Script bytes."""
     params = {}
 
     # Extract strategy name
-    strategy_match = re.search(r'strategy\s*\(\s*["\']([^"\']+)["\']', code, re.IGNORECASE)
+    strategy_match = _STRATEGY_NAME_RE.search(code)
     if strategy_match:
-        params['name'] = strategy_match.group(1)
+        params['name'] = strategy_match.group(1).decode('utf-8')
 
     # Extract inputs
-    inputs = re.findall(r'input\s*\([^)]+\)', code, re.IGNORECASE)
-    params['inputs'] = len(inputs)
+    params['inputs'] = len(_INPUT_RE.findall(code))
 
     return params
 
 
 def extract_indicators(code: str) -> List[str]:
-    """Extract indicator calls."""
-    indicators = []
-
-    # Common Pine Script indicator functions
-    indicator_funcs = [
-        'sma', 'ema', 'rsi', 'macd', 'bb', 'atr', 'stoch',
-        'wma', 'hull', 'vwma', 'vwap'
-    ]
-
-    for func in indicator_funcs:
-        if f'{func}(' in code.lower():
-            indicators.append(func)
-
-    return list(set(indicators))
+    """Extract indicator calls, sorted so output is stable across runs."""
+    return sorted({m.group(1).lower() for m in _INDICATOR_RE.finditer(code)})
 
 
 def generate_python_strategy(analysis: Dict) -> str:
     """Generate Python strategy from Pine Script analysis."""
 
     pine_path = analysis['path']
-    pine_code = read_pine_script(pine_path)
+    pine_bytes = read_pine_bytes(pine_path)
 
     # Extract information
     script_name = Path(pine_path).stem.replace('-', '_').title()
     script_type = analysis.get('type', 'indicator')
     indicators = analysis.get('indicators', [])
 
-    params = extract_strategy_params(pine_code)
+    params = extract_strategy_params(pine_bytes)
     name = params.get('name', script_name)
 
     # Generate Python template
@@ -199,28 +230,35 @@ class {script_name}Strategy(CtaTemplate):
     return python_code
 
 
-def convert_scripts(analyses: List[Dict]) -> Dict:
-    """Convert Pine Scripts to Python."""
+def write_python_file(python_file: Path, python_code: str):
+    """Write one converted strategy; run from the writer pool."""
+    python_file.write_bytes(python_code.encode('utf-8'))
+
+
+def convert_scripts(analyses: List[Dict], skipped: int = 0) -> Dict:
+    """Convert Pine strategies to Python.
+
+    `skipped` is the count of non-strategy scripts filtered out earlier by
+    find_unique_scripts, carried into the report.
+    """
     print(f"\nConverting {len(analyses)} scripts...")
 
     results = {
         "converted": 0,
-        "skipped": 0,
+        "skipped": skipped,
         "errors": 0,
         "scripts": []
     }
 
+    # (path, code, report entry) - written together after generation
+    pending = []
+
     for i, analysis in enumerate(analyses, 1):
         if i % 50 == 0:
             print(f"  Progress: {i}/{len(analyses)}")
 
         script_type = analysis.get('type', 'indicator')
 
-        # Only convert strategies (others can be added as indicators)
-        if script_type != 'strategy':
-            results['skipped'] += 1
-            continue
-
         try:
             python_code = generate_python_strategy(analysis)
 
@@ -228,50 +266,62 @@ def convert_scripts(analyses: List[Dict]) -> Dict:
             script_name = Path(analysis['path']).stem
             python_file = PYTHON_DIR / f"{script_name}.py"
 
-            python_file.write_text(python_code, encoding='utf-8')
-
-            results['scripts'].append({
+            pending.append((python_file, python_code, {
                 'pine_path': analysis['path'],
                 'python_path': str(python_file),
                 'script_name': script_name,
                 'type': script_type
-            })
-
-            results['converted'] += 1
+            }))
 
         except Exception as e:
             print(f"  Error converting {analysis['path']}: {e}")
             results['errors'] += 1
 
+    # Writes release the GIL, so a small pool overlaps the per-file syscalls
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as pool:
+        futures = [
+            (pool.submit(write_python_file, python_file, python_code), entry)
+            for python_file, python_code, entry in pending
+        ]
+
+    for future, entry in futures:
+        try:
+            future.result()
+            results['scripts'].append(entry)
+            results['converted'] += 1
+        except Exception as e:
+            print(f"  Error converting {entry['pine_path']}: {e}")
+            results['errors'] += 1
+
     return results
 
 
-def generate_conversion_report(results: Dict) -> str:
-    """Generate conversion report."""
-    report = "# Pine Script to Python Conversion Report\n\n"
-    report += f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}\n\n"
+def write_conversion_report(results: Dict, fp: TextIO) -> None:
+    """Write conversion report to an open text file."""
+    fp.write("# Pine Script to Python Conversion Report\n\n")
+    fp.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}\n\n")
 
-    report += "## Summary\n\n"
-    report += f"- **Converted:** {results['converted']}\n"
-    report += f"- **Skipped:** {results['skipped']}\n"
-    report += f"- **Errors:** {results['errors']}\n"
+    fp.write("## Summary\n\n")
+    fp.write(f"- **Converted:** {results['converted']}\n")
+    fp.write(f"- **Skipped:** {results['skipped']}\n")
+    fp.write(f"- **Errors:** {results['errors']}\n")
 
-    report += "\n## Converted Scripts\n\n"
+    fp.write("\n## Converted Scripts\n\n")
     for script in results['scripts'][:10]:  # Show first 10
-        report += f"- **{script['script_name']}**\n"
-        report += f"  - Type: {script['type']}\n"
-        report += f"  - Pine: `{script['pine_path']}`\n"
-        report += f"  - Python: `{script['python_path']}`\n\n"
+        fp.write(
+            f"- **{script['script_name']}**\n"
+            f"  - Type: {script['type']}\n"
+            f"  - Pine: `{script['pine_path']}`\n"
+            f"  - Python: `{script['python_path']}`\n\n"
+        )
 
     if len(results['scripts']) > 10:
-        report += f"... and {len(results['scripts']) - 10} more\n\n"
-
-    report += "## Notes\n\n"
-    report += "1. **Manual Review Required**: All converted strategies need manual review\n"
-    report += "2. **Indicator Logic**: Core logic needs to be manually converted from Pine\n"
-    report += "3. **Testing**: Each strategy should be backtested before live trading\n\n"
+        fp.write(f"... and {len(results['scripts']) - 10} more\n\n")
 
-    return report
+    fp.write("## Notes\n\n")
+    fp.write("1. **Manual Review Required**: All converted strategies need manual review\n")
+    fp.write("2. **Indicator Logic**: Core logic needs to be manually converted from Pine\n")
+    fp.write("3. **Testing**: Each strategy should be backtested before live trading\n\n")
 
 
 def main():
@@ -281,27 +331,22 @@ def main():
 
     # Load AI analysis
     print("\nLoading AI analysis...")
-    analysis = load_analysis()
-
-    if not analysis:
+    if not ANALYSIS_FILE.exists():
         print("ERROR: No analysis found. Run ai_deduplicate.py first.")
         return
 
     # Find unique scripts
     print("Finding unique scripts...")
-    unique_scripts = find_unique_scripts(analysis)
-    print(f"  Found {len(unique_scripts)} unique scripts")
+    unique_scripts, skipped = find_unique_scripts(iter_analyses())
+    print(f"  Found {len(unique_scripts)} unique strategies ({skipped} other scripts skipped)")
 
     # Convert to Python
-    results = convert_scripts(unique_scripts)
+    results = convert_scripts(unique_scripts, skipped)
 
-    # Generate report
+    # Generate report straight into the log file
     print("\nGenerating report...")
-    report = generate_conversion_report(results)
-
-    # Save report
-    print("Saving report...")
-    CONVERSION_LOG.write_text(report)
+    with CONVERSION_LOG.open('w', encoding='utf-8', buffering=1 << 20) as f:
+        write_conversion_report(results, f)
     print(f"  Report saved to: {CONVERSION_LOG}")
 
     # Summary